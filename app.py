@@ -6,8 +6,15 @@ renders it as a downloadable image, and visualizes the solution.
 """
 
 import streamlit as st
-import subprocess, json, tempfile, os, io
+import numpy as np
+import subprocess, threading, os, io, hashlib, functools
 from PIL import Image, ImageDraw, ImageFont
+from dataclasses import dataclass
+
+try:
+    from orjson import loads as json_loads  # parses bytes directly, several times faster
+except ImportError:
+    from json import loads as json_loads
 
 # ==============================
 # Streamlit Configuration
@@ -47,6 +54,18 @@ with settings_col:
 # ==============================
 # Helper Functions
 # ==============================
+@dataclass(frozen=True)
+class Geometry:
+    """Pixel layout of the grid on the page, shared by puzzle and solution."""
+    rows: int
+    cols: int
+    cell_size: int
+    start_x: int
+    start_y: int
+    width: int
+    height: int
+
+
 def convert_hex_to_rgb(hex_color, fallback=(0, 0, 0)):
     """Convert a hex color string to an RGB tuple."""
     try:
@@ -58,161 +77,316 @@ def convert_hex_to_rgb(hex_color, fallback=(0, 0, 0)):
         return fallback
 
 
-def run_cpp_solver(word_list, max_rows, max_cols, timeout_ms):
-    """Execute the C++ backend solver and return parsed JSON output."""
-    executable = "./wordsearch_solver" if os.name != 'nt' else "wordsearch_solver.exe"
-    if not os.path.exists(executable):
-        st.error(f"C++ executable not found: {executable}. Compile it before running.")
+def exchange_solver_message(proc, payload, timeout_s):
+    """Send one request to a --server solver; return the reply, or None if it times out."""
+    response = []
+
+    def read_response():
+        # Reply: byte length on its own line, then the JSON document
+        size_line = proc.stdout.readline()
+        if size_line.strip().isdigit():
+            response.append(proc.stdout.read(int(size_line)))
+
+    proc.stdin.write(payload)
+    proc.stdin.flush()
+    reader = threading.Thread(target=read_response, daemon=True)
+    reader.start()
+    reader.join(timeout_s)
+    return response[0] if response else None
+
+
+def get_solver_process(executable):
+    """Return this session's long-running solver, or None if the binary has no --server mode."""
+    if st.session_state.get("solver_one_shot"):
         return None
+    proc = st.session_state.get("solver_proc")
+    if proc is None or proc.poll() is not None:
+        proc = subprocess.Popen([executable, "--server"], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        # A server answers an empty request at once; an older binary just waits for more stdin
+        try:
+            reply = exchange_solver_message(proc, b"0 0 0 0\n", timeout_s=1.0)
+        except OSError:
+            reply = None
+        if reply is None:
+            proc.kill()
+            proc.wait()
+            st.session_state["solver_one_shot"] = True
+            return None
+        st.session_state["solver_proc"] = proc
+    return proc
+
 
+def stop_solver_process():
+    """Kill this session's solver so the next request starts a fresh one."""
+    proc = st.session_state.pop("solver_proc", None)
+    if proc is not None:
+        proc.kill()
+        proc.wait()
+
+
+def run_cpp_solver_once(executable, payload, max_rows, max_cols, timeout_ms):
+    """Run a solver without --server support for a single word list (fallback path)."""
     args = [executable, f"--timems={int(timeout_ms)}"]
     if max_rows > 0 and max_cols > 0:
         args += [f"--rows={max_rows}", f"--cols={max_cols}"]
 
-    input_data = "\n".join(word_list) + "\n"
-
+    stdout = b""
     try:
-        result = subprocess.run(
-            args,
-            input=input_data,
-            text=True,
-            capture_output=True,
-            timeout=(timeout_ms / 1000.0) + 5
-        )
-        if result.returncode != 0:
-            st.error("C++ solver error:\n" + result.stderr)
+        with subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE) as proc:
+            try:
+                stdout, stderr = proc.communicate(payload, timeout=(timeout_ms / 1000.0) + 5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                raise
+        if proc.returncode != 0:
+            st.error("C++ solver error:\n" + stderr.decode(errors="replace"))
             return None
-        return json.loads(result.stdout)
+        return json_loads(stdout)
     except subprocess.TimeoutExpired:
         st.error("C++ process timed out.")
     except Exception as e:
         st.error(f"Error parsing C++ output: {e}")
-        st.write("Raw output:", result.stdout)
+        st.write("Raw output:", stdout.decode(errors="replace"))
     return None
 
 
-def generate_puzzle_image(grid, word_positions, page_size, font_rgb, bg_rgb,
-                          transparent_bg, font_file, file_format,
+def run_cpp_solver(word_list, max_rows, max_cols, timeout_ms):
+    """Solve a word list with the C++ backend and return parsed JSON output."""
+    executable = "./wordsearch_solver" if os.name != 'nt' else "wordsearch_solver.exe"
+    if not os.path.exists(executable):
+        st.error(f"C++ executable not found: {executable}. Compile it before running.")
+        return None
+
+    # The solver only keeps A-Z, so non-ASCII characters can be replaced up front
+    words = "".join(word + "\n" for word in word_list).encode("ascii", "replace")
+
+    try:
+        proc = get_solver_process(executable)
+    except OSError as e:
+        # e.g. missing exec bit or a binary built for another platform
+        st.error(f"Could not start C++ solver {executable}: {e}. Recompile it before running.")
+        return None
+    if proc is None:
+        return run_cpp_solver_once(executable, words, max_rows, max_cols, timeout_ms)
+
+    # Request: "<rows> <cols> <timems> <count>" header, then one word per line
+    header = f"{max_rows} {max_cols} {int(timeout_ms)} {len(word_list)}\n".encode("ascii")
+    reply = None
+    try:
+        reply = exchange_solver_message(proc, header + words, (timeout_ms / 1000.0) + 5)
+        if reply is None:
+            exited = proc.poll() is not None
+            stop_solver_process()
+            st.error("C++ solver exited unexpectedly." if exited else "C++ process timed out.")
+            return None
+        # Keep the reply as raw bytes; json_loads parses them without a decode pass
+        puzzle_data = json_loads(reply)
+    except OSError as e:
+        stop_solver_process()
+        st.error(f"Could not reach the C++ solver: {e}")
+        return None
+    except Exception as e:
+        stop_solver_process()
+        st.error(f"Error parsing C++ output: {e}")
+        st.write("Raw output:", reply.decode(errors="replace") if reply else "")
+        return None
+
+    if "error" in puzzle_data:
+        st.error("C++ solver error:\n" + puzzle_data["error"])
+        return None
+    return puzzle_data
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_font(font_key, font_pt_size, _font_source):
+    """Load a TrueType font once per (font_key, size); `_font_source` is not hashed."""
+    return ImageFont.truetype(_font_source, font_pt_size)
+
+
+def fill_gradient(canvas, bg_rgb):
+    """Fill an RGB canvas with a vertical gradient from bg_rgb to light grey."""
+    height = canvas.shape[0]
+    t = np.linspace(0, 1, height)[:, None]
+    top = np.array(bg_rgb, dtype=np.float64)
+    bottom = np.array((240, 240, 240), dtype=np.float64)
+    canvas[:] = (top + (bottom - top) * t).astype(np.uint8)[:, None, :]
+
+
+def grid_region(canvas, geometry):
+    """Return the writable view of the canvas covered by the letter grid."""
+    x, y, cell_size = geometry.start_x, geometry.start_y, geometry.cell_size
+    return canvas[y:y + geometry.rows * cell_size, x:x + geometry.cols * cell_size]
+
+
+def blit_letters(canvas, grid_arr, font, geometry, ink):
+    """Rasterize each distinct letter once and blend it into every cell holding it."""
+    rows, cols, cell_size = geometry.rows, geometry.cols, geometry.cell_size
+
+    # All letters share one baseline from the font ascent; only the advance
+    # width (getlength) is measured per letter
+    ascent = font.getmetrics()[0] if hasattr(font, "getmetrics") else font.getbbox("A")[3]
+    y = (cell_size - ascent) / 2
+
+    # Copy each glyph into a grid-sized coverage mask viewed as (rows, cols, cell, cell)
+    coverage = np.zeros((rows * cell_size, cols * cell_size), dtype=np.uint8)
+    cells = coverage.reshape(rows, cell_size, cols, cell_size).transpose(0, 2, 1, 3)
+    for code in np.unique(grid_arr):
+        letter = chr(code)
+        glyph = Image.new("L", (cell_size, cell_size), 0)
+        x = (cell_size - font.getlength(letter)) / 2
+        ImageDraw.Draw(glyph).text((x, y), letter, fill=255, font=font)
+        cells[grid_arr == code] = np.asarray(glyph)
+
+    # Blend only covered pixels, rounding exactly as PIL's masked paste does
+    covered = coverage > 0
+    alpha = coverage[covered][:, None].astype(np.uint32)
+    region = grid_region(canvas, geometry)
+    blended = region[covered] * (255 - alpha) + np.array(ink, dtype=np.uint32) * alpha + 128
+    region[covered] = (blended + (blended >> 8)) >> 8
+
+
+# Each entry is a full pickled page (~50 MB at A3), so keep only the latest couple
+@st.cache_data(show_spinner=False, max_entries=2)
+def generate_puzzle_image(grid_arr, page_size, font_rgb, bg_rgb, transparent_bg, font_bytes,
                           font_pt_size=72, use_default_font=False):
-    """Render the puzzle grid as an image."""
+    """Render the puzzle grid as an (H, W, C) uint8 array and return it with its Geometry."""
     # Define page dimensions (300 DPI)
     page_dimensions = {"A5": (1748, 2480), "A4": (2480, 3508), "A3": (3508, 4961)}
     width, height = page_dimensions.get(page_size, page_dimensions["A4"])
-    rows, cols = len(grid), len(grid[0]) if grid else (0, 0)
+    rows, cols = grid_arr.shape
     margin = int(min(width, height) * 0.06)
     usable_w, usable_h = width - 2 * margin, height - 2 * margin
-    cell_size = min(usable_w // cols, usable_h // rows)
+    # An empty grid gets a zero cell size (and a blank page) instead of dividing by zero
+    cell_size = min(usable_w // cols, usable_h // rows) if rows and cols else 0
     start_x, start_y = (width - cell_size * cols) // 2, (height - cell_size * rows) // 2
+    geometry = Geometry(rows, cols, cell_size, start_x, start_y, width, height)
 
-    mode = "RGBA" if transparent_bg else "RGB"
-    background = (255, 255, 255, 0) if transparent_bg else bg_rgb
-    image = Image.new(mode, (width, height), background)
-    draw = ImageDraw.Draw(image)
+    if transparent_bg:
+        canvas = np.empty((height, width, 4), dtype=np.uint8)
+        canvas[:] = (255, 255, 255, 0)
+    else:
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        fill_gradient(canvas, bg_rgb)
+    if not cell_size:
+        return canvas, geometry
 
     # Load font
     try:
-        if font_file and os.path.exists(font_file):
-            font = ImageFont.truetype(font_file, font_pt_size)
+        if font_bytes:
+            font_key = hashlib.sha1(font_bytes).hexdigest()
+            font = load_font(font_key, font_pt_size, io.BytesIO(font_bytes))
         elif use_default_font and os.path.exists("Aaargh.ttf"):
-            font = ImageFont.truetype("Aaargh.ttf", font_pt_size)
+            font = load_font("Aaargh.ttf", font_pt_size, "Aaargh.ttf")
         else:
             font = ImageFont.load_default()
     except Exception:
         font = ImageFont.load_default()
 
-    # Optional gradient background
-    if not transparent_bg:
-        def blend(a, b, t): return tuple(int(a[i] + (b[i] - a[i]) * t) for i in range(3))
-        for i in range(height):
-            t = i / max(1, height - 1)
-            col = blend(bg_rgb, (240, 240, 240), t)
-            draw.line([(0, i), (width, i)], fill=col)
+    ink = font_rgb + (255,) if transparent_bg else font_rgb
+    blit_letters(canvas, grid_arr, font, geometry, ink)
+
+    return canvas, geometry
 
-    # Draw grid letters
-    for r in range(rows):
-        for c in range(cols):
-            letter = grid[r][c]
-            x, y = start_x + c * cell_size, start_y + r * cell_size
-            w, h = draw.textbbox((0, 0), letter, font=font)[2:]
-            draw.text((x + (cell_size - w) / 2, y + (cell_size - h) / 2),
-                      letter, fill=font_rgb, font=font)
 
-    return image
+def stamp_solution(canvas, placements, geometry):
+    """Outline every cell covered by a placed word in red, in place."""
+    rows, cols, cell_size = geometry.rows, geometry.cols, geometry.cell_size
+    if not cell_size:
+        return
+
+    # Mark grid cells covered by any placed word
+    hit = np.zeros((rows, cols), dtype=bool)
+    for word_data in placements:
+        k = np.arange(len(word_data["word"]))
+        word_rows = word_data["row"] + k * word_data["dr"]
+        word_cols = word_data["col"] + k * word_data["dc"]
+        hit[word_rows, word_cols] = True
+
+    # 3px outline inset by 2px, as draw.rectangle(..., width=3) would draw it
+    stamp = np.zeros((cell_size, cell_size), dtype=bool)
+    stamp[2:5, 2:cell_size - 2] = stamp[cell_size - 5:cell_size - 2, 2:cell_size - 2] = True
+    stamp[2:cell_size - 2, 2:5] = stamp[2:cell_size - 2, cell_size - 5:cell_size - 2] = True
+
+    # View the grid-sized mask as (rows, cols, cell, cell) and stamp all hit cells at once
+    mask = np.zeros((rows * cell_size, cols * cell_size), dtype=bool)
+    mask.reshape(rows, cell_size, cols, cell_size).transpose(0, 2, 1, 3)[hit] = stamp
+    grid_region(canvas, geometry)[mask] = (255, 0, 0, 255)[:canvas.shape[2]]
+
+
+def encode_image(canvas, file_format):
+    """Encode a canvas for download, favouring encode speed over file size."""
+    image = Image.fromarray(canvas)
+    buffer = io.BytesIO()
+    if file_format == "PNG":
+        image.save(buffer, format="PNG", compress_level=1, optimize=False)
+    else:
+        image.save(buffer, format=file_format, quality=85, optimize=False, progressive=False)
+    buffer.seek(0)
+    return buffer
+
+
+def encode_solution(placements, file_format, *render_args):
+    """Render (cached), outline and encode the solution; used as a deferred download."""
+    canvas, geometry = generate_puzzle_image(*render_args)
+    stamp_solution(canvas, placements, geometry)
+    return encode_image(canvas, file_format)
 
 
 # ==============================
 # Generate Puzzle Action
 # ==============================
+word_list = [line.strip() for line in user_word_input.splitlines() if line.strip()]
+puzzle_key = hashlib.sha1("\n".join(word_list).encode()).hexdigest() + f"|{cpp_timeout_ms}"
+
 if st.button("Generate Puzzle"):
-    word_list = [line.strip() for line in user_word_input.splitlines() if line.strip()]
     if not word_list:
         st.error("Please enter at least one word.")
     else:
-        puzzle_data = run_cpp_solver(word_list, 0, 0, cpp_timeout_ms)
-        if puzzle_data:
-            grid = puzzle_data["grid"]
-            placements = puzzle_data["placements"]
-            placed_words = puzzle_data["placed_words"]
-            unplaced_words = puzzle_data["unplaced_words"]
-
-            st.success(f"Placed {len(placed_words)} words; {len(unplaced_words)} unplaced.")
-            st.write("✅ Placed:", placed_words)
-            if unplaced_words:
-                st.warning("⚠️ Unplaced: " + ", ".join(unplaced_words))
-
-            # Save uploaded font temporarily
-            temp_font_path = None
-            if custom_font_upload:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".ttf") as temp_font:
-                    temp_font.write(custom_font_upload.read())
-                    temp_font_path = temp_font.name
-
-            # Generate puzzle image
-            font_rgb = convert_hex_to_rgb(font_color_hex)
-            bg_rgb = convert_hex_to_rgb(background_color_hex, (255, 255, 255))
-            puzzle_image = generate_puzzle_image(
-                grid, placements, paper_size, font_rgb, bg_rgb,
-                is_transparent_bg, temp_font_path, output_format,
-                font_size_pt, use_default_font
-            )
-            st.image(puzzle_image, width=min(puzzle_image.width, 1200))
-
-            # Download puzzle
-            puzzle_buffer = io.BytesIO()
-            puzzle_image.save(puzzle_buffer, format=output_format)
-            puzzle_buffer.seek(0)
-            st.download_button("⬇️ Download Puzzle", puzzle_buffer,
-                               file_name=f"wordsearch.{output_format.lower()}")
-
-            # Generate and show solution
-            solution_image = puzzle_image.copy()
-            draw = ImageDraw.Draw(solution_image)
-            page_dimensions = {"A5": (1748, 2480), "A4": (2480, 3508), "A3": (3508, 4961)}
-            width, height = page_dimensions.get(paper_size, page_dimensions["A4"])
-            margin = int(min(width, height) * 0.06)
-            usable_w, usable_h = width - 2 * margin, height - 2 * margin
-            rows, cols = len(grid), len(grid[0])
-            cell_size = min(usable_w // cols, usable_h // rows)
-            start_x, start_y = (width - cell_size * cols) // 2, (height - cell_size * rows) // 2
-
-            for word_data in placements:
-                for k in range(len(word_data["word"])):
-                    x = start_x + (word_data["col"] + k * word_data["dc"]) * cell_size
-                    y = start_y + (word_data["row"] + k * word_data["dr"]) * cell_size
-                    draw.rectangle([x + 2, y + 2, x + cell_size - 3, y + cell_size - 3],
-                                   outline=(255, 0, 0), width=3)
-
-            solution_buffer = io.BytesIO()
-            solution_image.save(solution_buffer, format=output_format)
-            solution_buffer.seek(0)
-            st.image(solution_image, caption="Solution (highlighted)",
-                     width=min(puzzle_image.width, 1200))
-            st.download_button("⬇️ Download Solution", solution_buffer,
-                               file_name=f"wordsearch_solution.{output_format.lower()}")
-
-            # Cleanup
-            if temp_font_path:
-                try:
-                    os.remove(temp_font_path)
-                except Exception:
-                    pass
+        # Solve on click only; other reruns reuse the stored result for these words
+        st.session_state["puzzle"] = run_cpp_solver(word_list, 0, 0, cpp_timeout_ms)
+        st.session_state["puzzle_key"] = puzzle_key
+
+if st.session_state.get("puzzle_key") == puzzle_key:
+    puzzle_data = st.session_state["puzzle"]
+    if puzzle_data:
+        grid = puzzle_data["grid"]
+        grid_arr = np.frombuffer("".join(grid).encode("ascii"), dtype=np.uint8)
+        grid_arr = grid_arr.reshape(len(grid), len(grid[0]) if grid else 0)
+        placements = puzzle_data["placements"]
+        placed_words = puzzle_data["placed_words"]
+        unplaced_words = puzzle_data["unplaced_words"]
+
+        st.success(f"Placed {len(placed_words)} words; {len(unplaced_words)} unplaced.")
+        st.write("✅ Placed:", placed_words)
+        if unplaced_words:
+            st.warning("⚠️ Unplaced: " + ", ".join(unplaced_words))
+
+        # Uploaded font is passed as bytes; no temporary file needed
+        custom_font_bytes = custom_font_upload.getvalue() if custom_font_upload else None
+
+        # Generate puzzle image
+        font_rgb = convert_hex_to_rgb(font_color_hex)
+        bg_rgb = convert_hex_to_rgb(background_color_hex, (255, 255, 255))
+        render_args = (grid_arr, paper_size, font_rgb, bg_rgb, is_transparent_bg,
+                       custom_font_bytes, font_size_pt, use_default_font)
+        canvas, geometry = generate_puzzle_image(*render_args)
+        st.image(canvas, width=min(geometry.width, 1200))
+
+        # Download puzzle (encoded before the solution is drawn over it)
+        puzzle_buffer = encode_image(canvas, output_format)
+        st.download_button("⬇️ Download Puzzle", puzzle_buffer,
+                           file_name=f"wordsearch.{output_format.lower()}")
+
+        # Generate and show solution on the same canvas; cache hits are fresh copies
+        stamp_solution(canvas, placements, geometry)
+
+        st.image(canvas, caption="Solution (highlighted)",
+                 width=min(geometry.width, 1200))
+        # Encoded only when the button is clicked. The partial binds only the small
+        # render inputs, not the page-sized canvas, and re-renders from the cache.
+        st.download_button("⬇️ Download Solution",
+                           functools.partial(encode_solution, placements, output_format,
+                                             *render_args),
+                           file_name=f"wordsearch_solution.{output_format.lower()}")
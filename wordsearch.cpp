@@ -3,6 +3,11 @@
 WORD SEARCH PUZZLE GENERATOR
 ---------------------------------------------------------------------
 Generates a word search grid that maximizes overlap between words.
+
+One-shot mode reads words from stdin and prints one JSON result.
+With --server it instead loops over requests on stdin:
+  request : "<rows> <cols> <timems> <count>\n" followed by <count> word lines
+  response: "<nbytes>\n" followed by <nbytes> of JSON
 =====================================================================
 */
 
@@ -14,6 +19,7 @@ Generates a word search grid that maximizes overlap between words.
 #include <ctime>
 #include <set>
 #include <chrono>
+#include <sstream>
 using namespace std;
 
 /*---------------------------------------------------------------
@@ -59,6 +65,14 @@ string normalizeWord(const string &input) {
     return clean;
 }
 
+// Strip leading/trailing spaces and tabs
+string trimWhitespace(const string &line) {
+    size_t a = line.find_first_not_of(" \t");
+    size_t b = line.find_last_not_of(" \t");
+    if(a == string::npos) return "";
+    return line.substr(a, b - a + 1);
+}
+
 // Check if a cell is within grid boundaries
 bool isInBounds(int r, int c) {
     return r >= 0 && r < GRID_ROWS && c >= 0 && c < GRID_COLS;
@@ -241,34 +255,38 @@ PuzzleResult generateWordSearch(const vector<string>& words,
 }
 
 /*---------------------------------------------------------------
-  MAIN FUNCTION
+  JSON OUTPUT
 ---------------------------------------------------------------*/
-int main(int argc, char** argv) {
-    ios::sync_with_stdio(false);
-    cin.tie(nullptr);
-
-    int cli_rows = 0, cli_cols = 0;
-    for(int i = 1; i < argc; i++) {
-        string arg = argv[i];
-        if(arg.rfind("--rows=", 0) == 0) cli_rows = stoi(arg.substr(7));
-        else if(arg.rfind("--cols=", 0) == 0) cli_cols = stoi(arg.substr(7));
-        else if(arg.rfind("--timems=", 0) == 0) MAX_RUNTIME_MS = stoi(arg.substr(9));
-    }
-
-    vector<string> input_lines;
-    string line;
-    while(getline(cin, line)) {
-        size_t a = line.find_first_not_of(" \t");
-        size_t b = line.find_last_not_of(" \t");
-        if(a == string::npos) continue;
-        input_lines.push_back(line.substr(a, b - a + 1));
+void writeResultJson(ostream &out, int rows, int cols, const PuzzleResult &result) {
+    out << "{\n";
+    out << "\"rows\": " << rows << ",\n";
+    out << "\"cols\": " << cols << ",\n";
+    out << "\"grid\": [\n";
+    for(int r = 0; r < rows; r++)
+        out << "\"" << result.grid[r] << "\"" << (r + 1 < rows ? "," : "") << "\n";
+    out << "],\n\"placements\": [\n";
+    for(size_t i = 0; i < result.placements.size(); ++i) {
+        auto &p = result.placements[i];
+        out << "{\"word\":\"" << p.word << "\",\"row\":" << p.row
+            << ",\"col\":" << p.col << ",\"dr\":" << p.delta_row << ",\"dc\":" << p.delta_col << "}"
+            << (i + 1 < result.placements.size() ? "," : "") << "\n";
     }
+    out << "],\n\"placed_words\": [";
+    for(size_t i = 0; i < result.placed_words.size(); ++i)
+        out << "\"" << result.placed_words[i] << "\"" << (i + 1 < result.placed_words.size() ? "," : "");
+    out << "],\n\"unplaced_words\": [";
+    for(size_t i = 0; i < result.unplaced_words.size(); ++i)
+        out << "\"" << result.unplaced_words[i] << "\"" << (i + 1 < result.unplaced_words.size() ? "," : "");
+    out << "]\n}\n";
+}
 
-    if(input_lines.empty()) {
-        cerr << "Provide words via stdin (one per line). Prefix * for must-include words.\n";
-        return 1;
-    }
+/*---------------------------------------------------------------
+  REQUEST HANDLING
+---------------------------------------------------------------*/
 
+// Normalize the input lines, solve, and write the JSON result; returns false with an error message
+bool solveWordList(const vector<string>& input_lines, int cli_rows, int cli_cols, int runtime_ms,
+                   ostream &out, string &error) {
     vector<string> words;
     vector<bool> required_flags;
     int max_word_len = 0;
@@ -285,8 +303,8 @@ int main(int argc, char** argv) {
     }
 
     if(words.empty()) {
-        cerr << "No valid words found after normalization.\n";
-        return 1;
+        error = "No valid words found after normalization.";
+        return false;
     }
 
     int rows = cli_rows, cols = cli_cols;
@@ -297,29 +315,79 @@ int main(int argc, char** argv) {
         rows = cols = max(estimated, 10);
     }
 
-    PuzzleResult result = generateWordSearch(words, required_flags, rows, cols, MAX_RUNTIME_MS);
+    PuzzleResult result = generateWordSearch(words, required_flags, rows, cols, runtime_ms);
+    writeResultJson(out, rows, cols, result);
+    return true;
+}
 
-    // Output as JSON
-    cout << "{\n";
-    cout << "\"rows\": " << rows << ",\n";
-    cout << "\"cols\": " << cols << ",\n";
-    cout << "\"grid\": [\n";
-    for(int r = 0; r < rows; r++)
-        cout << "\"" << result.grid[r] << "\"" << (r + 1 < rows ? "," : "") << "\n";
-    cout << "],\n\"placements\": [\n";
-    for(size_t i = 0; i < result.placements.size(); ++i) {
-        auto &p = result.placements[i];
-        cout << "{\"word\":\"" << p.word << "\",\"row\":" << p.row
-             << ",\"col\":" << p.col << ",\"dr\":" << p.delta_row << ",\"dc\":" << p.delta_col << "}"
-             << (i + 1 < result.placements.size() ? "," : "") << "\n";
+// Answer length-prefixed requests until stdin closes, keeping the process warm between puzzles
+void runServer() {
+    string header;
+    while(getline(cin, header)) {
+        istringstream header_stream(header);
+        int rows = 0, cols = 0, runtime_ms = MAX_RUNTIME_MS;
+        size_t count = 0;
+        ostringstream body;
+        string error;
+
+        if(!(header_stream >> rows >> cols >> runtime_ms >> count)) {
+            error = "Malformed request header.";
+        } else {
+            vector<string> input_lines;
+            string line;
+            for(size_t i = 0; i < count && getline(cin, line); i++) {
+                string trimmed = trimWhitespace(line);
+                if(!trimmed.empty()) input_lines.push_back(trimmed);
+            }
+            solveWordList(input_lines, rows, cols, runtime_ms, body, error);
+        }
+
+        if(!error.empty()) body << "{\"error\": \"" << error << "\"}\n";
+        string payload = body.str();
+        cout << payload.size() << "\n" << payload;
+        cout.flush();
+    }
+}
+
+/*---------------------------------------------------------------
+  MAIN FUNCTION
+---------------------------------------------------------------*/
+int main(int argc, char** argv) {
+    ios::sync_with_stdio(false);
+    cin.tie(nullptr);
+
+    int cli_rows = 0, cli_cols = 0;
+    bool server_mode = false;
+    for(int i = 1; i < argc; i++) {
+        string arg = argv[i];
+        if(arg.rfind("--rows=", 0) == 0) cli_rows = stoi(arg.substr(7));
+        else if(arg.rfind("--cols=", 0) == 0) cli_cols = stoi(arg.substr(7));
+        else if(arg.rfind("--timems=", 0) == 0) MAX_RUNTIME_MS = stoi(arg.substr(9));
+        else if(arg == "--server") server_mode = true;
+    }
+
+    if(server_mode) {
+        runServer();
+        return 0;
+    }
+
+    vector<string> input_lines;
+    string line;
+    while(getline(cin, line)) {
+        string trimmed = trimWhitespace(line);
+        if(!trimmed.empty()) input_lines.push_back(trimmed);
+    }
+
+    if(input_lines.empty()) {
+        cerr << "Provide words via stdin (one per line). Prefix * for must-include words.\n";
+        return 1;
+    }
+
+    string error;
+    if(!solveWordList(input_lines, cli_rows, cli_cols, MAX_RUNTIME_MS, cout, error)) {
+        cerr << error << "\n";
+        return 1;
     }
-    cout << "],\n\"placed_words\": [";
-    for(size_t i = 0; i < result.placed_words.size(); ++i)
-        cout << "\"" << result.placed_words[i] << "\"" << (i + 1 < result.placed_words.size() ? "," : "");
-    cout << "],\n\"unplaced_words\": [";
-    for(size_t i = 0; i < result.unplaced_words.size(); ++i)
-        cout << "\"" << result.unplaced_words[i] << "\"" << (i + 1 < result.unplaced_words.size() ? "," : "");
-    cout << "]\n}\n";
 
     return 0;
 }